@@ -1,8 +1,37 @@
-from flask import Flask, render_template, redirect, url_for, request, jsonify
+from flask import Flask, redirect, url_for, request, jsonify, make_response, abort
+from flask.json.provider import DefaultJSONProvider
+import atexit
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import logging.handlers
 import os
+import queue
+import select
 import subprocess
 import sys
-import stripe  # Add Stripe import
+import threading
+
+# orjson is optional; without it jsonify falls back to the stdlib json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson instead of the stdlib json module."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Import Stripe configuration
 try:
@@ -14,21 +43,248 @@ except ImportError:
 template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'templates'))
 static_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'static'))
 app = Flask(__name__, template_folder=template_dir, static_folder=static_dir)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+app.config['MAX_CONTENT_LENGTH'] = 1 << 20 # 1 MiB; Werkzeug only applies it to form parsing, /webhook checks it itself
+
+# Logging: request threads only enqueue records; a background listener thread
+# does the actual writes to stderr
+_log_queue = queue.Queue(-1)
+logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s',
+                    handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+atexit.register(_log_listener.stop) # Flush anything still queued on shutdown
+
+# Templates never change while the app is running, so load them once up front;
+# the pages are rendered once as well, after the routes are registered (see below).
+app.jinja_env.auto_reload = False
+app.jinja_env.cache_size = -1  # Unbounded cache
+with app.app_context():
+    INDEX_TMPL = app.jinja_env.get_template('index.html')
+    SETTINGS_TMPL = app.jinja_env.get_template('settings.html')
+
+# Path to the pygame chess game and the command used to launch it
+MAIN_PY_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'main.py'))
+# Checked once here: Popen runs the interpreter, which exists even when main.py doesn't,
+# so a missing main.py would otherwise only show up as a game that never opens
+MAIN_PY_EXISTS = os.path.isfile(MAIN_PY_PATH)
+CMD_PREFIX = [sys.executable, MAIN_PY_PATH]
+if sys.platform == 'win32':
+    # Windows: Open the game in its own console directly, without a cmd.exe hop
+    POPEN_KWARGS = {'creationflags': subprocess.CREATE_NEW_CONSOLE | subprocess.CREATE_NEW_PROCESS_GROUP}
+else:
+    # Linux/Mac: Detach the game from the server's session, and skip closing
+    # every inherited fd in the child (slow when the server has many sockets open)
+    POPEN_KWARGS = {'close_fds': False, 'start_new_session': True}
+
+# Accepted /start-game parameters, in the format main.py expects
+VALID_DIFFICULTIES = frozenset('01234')
+COLOR_VALUES = {'white': '0', 'black': '1'}
+
+# Windows fallback launcher: a batch file taking skill and color as %1 and %2,
+# written once here so the fallback path doesn't touch the filesystem
+BATCH_PATH = os.path.join(os.path.dirname(MAIN_PY_PATH), "launch_game.bat")
+if sys.platform == 'win32':
+    try:
+        with open(BATCH_PATH, 'w') as f:
+            f.write(f'@echo off\ncd "{os.path.dirname(MAIN_PY_PATH)}"\n"{sys.executable}" "{MAIN_PY_PATH}" --skill %1 --color %2\npause')
+    except OSError as e:
+        app.logger.warning(f"Could not write fallback launcher {BATCH_PATH}: {e}")
+
+# --- Warm game launcher ---
+# On platforms with fork, a helper process (game_launcher.py) keeps pygame and
+# python-chess imported and forks a game per request, avoiding a cold start.
+# It answers each request with the forked game's PID on a separate pipe; if it
+# doesn't, or if it ever exits, games are launched with Popen from then on.
+LAUNCHER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'game_launcher.py')
+LAUNCHER_REPLY_TIMEOUT = 10 # Seconds to wait for the launcher to confirm a game (covers its start-up imports)
+_launcher = None
+_launcher_reply_fd = None # Read end of the pipe the launcher writes its replies to
+_launcher_disabled = not hasattr(os, 'fork')
+_launcher_lock = threading.Lock()
+
+def _disable_launcher(reason):
+    """Stops using the warm launcher for the rest of the process and shuts it down."""
+    global _launcher, _launcher_reply_fd, _launcher_disabled
+    app.logger.warning(f"Game launcher disabled, launching games directly: {reason}")
+    _launcher_disabled = True
+    if _launcher is not None and _launcher.poll() is None:
+        _launcher.kill()
+    if _launcher_reply_fd is not None:
+        os.close(_launcher_reply_fd)
+    _launcher = _launcher_reply_fd = None
+
+def _start_launcher():
+    """Starts the warm launcher process on first use. Returns it, or None if unavailable."""
+    global _launcher, _launcher_reply_fd
+    if _launcher_disabled:
+        return None
+    if _launcher is not None:
+        if _launcher.poll() is not None: # It exited; don't keep respawning a launcher that can't run
+            _disable_launcher(f"launcher exited with code {_launcher.returncode}")
+            return None
+        return _launcher
+    read_fd, write_fd = os.pipe()
+    try:
+        _launcher = subprocess.Popen([sys.executable, LAUNCHER_PATH, MAIN_PY_PATH, str(write_fd)],
+                                     stdin=subprocess.PIPE, text=True, pass_fds=(write_fd,))
+        _launcher_reply_fd = read_fd
+    except OSError as e:
+        os.close(read_fd)
+        _disable_launcher(f"could not start launcher: {e}")
+    finally:
+        os.close(write_fd)
+    return _launcher
+
+def _launch_warm(difficulty, color_value):
+    """Asks the warm launcher to start a game. Returns False if it couldn't confirm one started."""
+    with _launcher_lock:
+        launcher = _start_launcher()
+        if launcher is None:
+            return False
+        try:
+            launcher.stdin.write(f"{difficulty} {color_value}\n")
+            launcher.stdin.flush()
+            # poll() rather than select(): select() can't handle fds >= 1024, which a busy server reaches
+            poller = select.poll()
+            poller.register(_launcher_reply_fd, select.POLLIN)
+            ready = poller.poll(LAUNCHER_REPLY_TIMEOUT * 1000)
+            reply = os.read(_launcher_reply_fd, 64).decode().strip() if ready else ''
+        except OSError as e:
+            reply = ''
+            app.logger.warning(f"Game launcher unavailable: {e}")
+        if reply.isdigit():
+            app.logger.info(f"Game started by warm launcher (pid {reply})")
+            return True
+        _disable_launcher(f"no confirmation for the game request (reply {reply!r})")
+        return False
+
+def _list_dir(path):
+    """Returns the set of entry names in a directory, or None if it can't be read."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return None
+
+# Snapshot the directories /debug reports on; they don't change while running
+_TEMPLATE_FILES = _list_dir(template_dir)
+_STATIC_FILES = _list_dir(static_dir)
 
 # Stripe configuration
-stripe.api_key = stripe_config.STRIPE_SECRET_KEY
+# The Stripe SDK (and requests underneath it) is imported on first use, so
+# start-up and the pages that never talk to Stripe don't pay for it.
+_stripe = None
+
+def _get_stripe():
+    """Imports and configures the Stripe SDK the first time it's needed."""
+    global _stripe
+    if _stripe is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        import stripe
+
+        stripe.api_key = stripe_config.STRIPE_SECRET_KEY
+        # Share one pooled HTTP session across all Stripe calls so connections
+        # (and their TLS handshakes) are reused between requests
+        session = requests.Session()
+        session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        stripe.default_http_client = stripe.http_client.RequestsClient(session=session)
+        _stripe = stripe
+    return _stripe
+
 STRIPE_PUBLISHABLE_KEY = stripe_config.STRIPE_PUBLISHABLE_KEY
 STRIPE_WEBHOOK_SECRET = stripe_config.STRIPE_WEBHOOK_SECRET
 YOUR_DOMAIN = stripe_config.YOUR_DOMAIN
 ENABLE_SIMULATION = stripe_config.ENABLE_SIMULATION
 
+# Checkout session parameters never change, so build them once
+SUCCESS_URL = f"{YOUR_DOMAIN}/success?session_id={{CHECKOUT_SESSION_ID}}"
+CANCEL_URL = f"{YOUR_DOMAIN}/"
+STRIPE_PRICE_ID = getattr(stripe_config, 'STRIPE_PRICE_ID', None) # Optional; older stripe_config.py files don't have it
+if STRIPE_PRICE_ID:
+    LINE_ITEMS = [{'price': STRIPE_PRICE_ID, 'quantity': 1}]
+else:
+    LINE_ITEMS = [
+        {
+            'price_data': {
+                'currency': 'usd',
+                'product_data': {
+                    'name': 'Chess AI Opponent Access',
+                    'description': 'Access to play against AI chess opponents of varying difficulty levels',
+                    'images': [f"{YOUR_DOMAIN}/static/images/chess_fundraiser.png"],
+                },
+                'unit_amount': 100,  # $1.00 in cents
+            },
+            'quantity': 1,
+        },
+    ]
+
+# Payment status by checkout session ID, recorded by the webhook (or by a
+# background check from /success if the webhook hasn't arrived yet).
+# Failed checks are recorded as 'error' so the same ID isn't looked up again.
+PAYMENT_STATUS_MAX = 10000 # Oldest entries are dropped beyond this
+MAX_PENDING_VERIFICATIONS = 50 # Background Stripe lookups allowed in flight or queued
+payment_status = {}
+_verify_pending = set() # Session IDs with a background check queued or running
+_payment_lock = threading.Lock()
+_verify_executor = ThreadPoolExecutor(max_workers=2)
+
+def _record_payment_status(session_id, status):
+    """Stores a session's payment status, evicting the oldest entries past PAYMENT_STATUS_MAX."""
+    with _payment_lock:
+        payment_status[session_id] = status
+        while len(payment_status) > PAYMENT_STATUS_MAX:
+            del payment_status[next(iter(payment_status))]
+
+def _verify_payment(session_id):
+    """Verifies with Stripe that a checkout session was paid and records the result."""
+    try:
+        session = _get_stripe().checkout.Session.retrieve(session_id)
+        _record_payment_status(session_id, session.payment_status)
+        if session.payment_status == "paid":
+            app.logger.info(f"Verified successful payment for session {session_id}")
+        else:
+            app.logger.warning(f"Payment not complete for session {session_id}")
+    except Exception as e:
+        _record_payment_status(session_id, 'error')
+        app.logger.error(f"Error verifying payment: {e}")
+    finally:
+        with _payment_lock:
+            _verify_pending.discard(session_id)
+
+def _queue_payment_check(session_id):
+    """Queues a background Stripe check for a session unless it's known, already queued, or the queue is full."""
+    with _payment_lock:
+        if session_id in payment_status or session_id in _verify_pending:
+            return
+        if len(_verify_pending) >= MAX_PENDING_VERIFICATIONS:
+            app.logger.warning(f"Too many pending payment checks; skipping session {session_id}")
+            return
+        _verify_pending.add(session_id)
+    _verify_executor.submit(_verify_payment, session_id)
+
 # --- Routes ---
 
+def _render_static_page(template):
+    """Renders a page that never changes once, returning its body and ETag."""
+    body = template.render().encode()
+    return body, hashlib.sha1(body).hexdigest()
+
+def _cacheable_page(page):
+    """Serves a pre-rendered page with caching headers so browsers can revalidate it with a 304."""
+    body, etag = page
+    response = make_response(body)
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
     """Displays the main landing/fundraiser page."""
-    print("Rendering index.html")
-    return render_template('index.html')
+    app.logger.info("Serving index page")
+    return _cacheable_page(INDEX_PAGE)
 
 @app.route('/checkout', methods=['GET', 'POST'])
 def checkout():
@@ -39,66 +295,46 @@ def checkout():
     try:
         # Use the simulated checkout if ENABLE_SIMULATION is True
         if ENABLE_SIMULATION:
-            print("Simulating Stripe Checkout (ENABLE_SIMULATION=True)")
-            return redirect(url_for('success'))
+            app.logger.info("Simulating Stripe Checkout (ENABLE_SIMULATION=True)")
+            return redirect(SUCCESS_URL_PATH)
         
         # Create Stripe checkout session
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = _get_stripe().checkout.Session.create(
             payment_method_types=['card'],
-            line_items=[
-                {
-                    'price_data': {
-                        'currency': 'usd',
-                        'product_data': {
-                            'name': 'Chess AI Opponent Access',
-                            'description': 'Access to play against AI chess opponents of varying difficulty levels',
-                            'images': [f"{YOUR_DOMAIN}/static/images/chess_fundraiser.png"],
-                        },
-                        'unit_amount': 100,  # $1.00 in cents
-                    },
-                    'quantity': 1,
-                },
-            ],
+            line_items=LINE_ITEMS,
             mode='payment',
-            success_url=f"{YOUR_DOMAIN}/success?session_id={{CHECKOUT_SESSION_ID}}",
-            cancel_url=f"{YOUR_DOMAIN}/",
+            success_url=SUCCESS_URL,
+            cancel_url=CANCEL_URL,
         )
-        print(f"Created Stripe checkout session: {checkout_session.id}")
+        app.logger.info(f"Created Stripe checkout session: {checkout_session.id}")
         return redirect(checkout_session.url, code=303)
     
     except Exception as e:
-        print(f"Error creating Stripe checkout session: {e}")
+        app.logger.error(f"Error creating Stripe checkout session: {e}")
         return jsonify(error=str(e)), 500
 
 @app.route('/success')
 def success():
     """
     Handles the successful payment redirect from Stripe.
-    In a real app, verify the payment was successful using the session_id.
+    Payment is confirmed by the webhook; if it hasn't arrived yet, the session
+    is checked with Stripe in the background so the redirect isn't delayed.
     """
     session_id = request.args.get('session_id')
     
     if session_id:
-        try:
-            # Verify the payment was successful with Stripe
-            session = stripe.checkout.Session.retrieve(session_id)
-            if session.payment_status == "paid":
-                print(f"Verified successful payment for session {session_id}")
-            else:
-                print(f"Payment not complete for session {session_id}")
-        except Exception as e:
-            print(f"Error verifying payment: {e}")
+        _queue_payment_check(session_id)
     else:
-        print("No session_id provided. This is either a simulated payment or direct access.")
+        app.logger.info("No session_id provided. This is either a simulated payment or direct access.")
     
     # Redirect to game settings regardless
-    return redirect(url_for('game_settings'))
+    return redirect(SETTINGS_URL_PATH)
 
 @app.route('/settings')
 def game_settings():
     """Displays the game settings page (difficulty/color selection)."""
-    print("Loading game settings page...")
-    return render_template('settings.html')
+    app.logger.info("Serving game settings page")
+    return _cacheable_page(SETTINGS_PAGE)
 
 @app.route('/start-game')
 def start_game():
@@ -111,41 +347,32 @@ def start_game():
     difficulty = request.args.get('difficulty', '0')
     color = request.args.get('color', 'white')
     
+    if difficulty not in VALID_DIFFICULTIES:
+        return jsonify({
+            'status': 'error',
+            'message': f'Invalid difficulty: {difficulty!r}. Expected 0-4.'
+        }), 400
+    
     # Convert to the format expected by the pygame app
-    color_value = '1' if color == 'black' else '0'  # 0 for white, 1 for black
+    color_value = COLOR_VALUES.get(color, '0')
+    
+    if not MAIN_PY_EXISTS:
+        return jsonify({
+            'status': 'error',
+            'message': f'Could not find main.py at path: {MAIN_PY_PATH}'
+        }), 404
     
     try:
-        # Path to the main.py file
-        main_py_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'main.py'))
-        print(f"Looking for main.py at: {main_py_path}")
-        
-        if not os.path.exists(main_py_path):
-            return jsonify({
-                'status': 'error',
-                'message': f'Could not find main.py at path: {main_py_path}'
-            }), 404
-        
-        # Prepare the command with proper arguments
-        # On Windows, use 'python' or 'py' for PowerShell/CMD
-        
-        # Try using Python executable directly
-        if sys.platform == 'win32':
-            # Windows: Use start command to launch in a new window
-            cmd = ['start', 'cmd', '/c', sys.executable, main_py_path, 
-                   '--skill', difficulty, '--color', color_value]
-            shell_required = True
-        else:
-            # Linux/Mac: Standard execution
-            cmd = [sys.executable, main_py_path, 
-                   '--skill', difficulty, '--color', color_value]
-            shell_required = False
+        cmd = CMD_PREFIX + ['--skill', difficulty, '--color', color_value]
         
         # Start the game in a new process
-        print(f"Starting game with: difficulty={difficulty}, color={color}")
-        print(f"Command: {' '.join(cmd)}")
+        app.logger.info(f"Starting game with: difficulty={difficulty}, color={color}")
+        app.logger.info(f"Command: {' '.join(cmd)}")
         
-        # Using subprocess.Popen to start the process without waiting for it to complete
-        process = subprocess.Popen(cmd, shell=shell_required)
+        # Prefer the warm launcher; otherwise use subprocess.Popen to start
+        # the process without waiting for it to complete
+        if not _launch_warm(difficulty, color_value):
+            process = subprocess.Popen(cmd, **POPEN_KWARGS)
         
         # Return a success message
         return jsonify({
@@ -159,21 +386,15 @@ def start_game():
     
     except Exception as e:
         # If there's an error, return an error message
-        print(f"Error starting game: {e}")
+        app.logger.error(f"Error starting game: {e}")
         
         # Try an alternative method as a fallback
         try:
-            print("Trying alternative launch method...")
+            app.logger.info("Trying alternative launch method...")
             if sys.platform == 'win32':
-                # Create a batch file to launch the game
-                batch_content = f'@echo off\ncd "{os.path.dirname(main_py_path)}"\n"{sys.executable}" "{main_py_path}" --skill {difficulty} --color {color_value}\npause'
-                batch_path = os.path.join(os.path.dirname(main_py_path), "launch_game.bat")
-                
-                with open(batch_path, 'w') as f:
-                    f.write(batch_content)
-                
-                # Execute the batch file
-                os.startfile(batch_path)
+                # Execute the batch file written at startup in a new console window
+                subprocess.Popen(['cmd', '/c', BATCH_PATH, difficulty, color_value],
+                                 creationflags=subprocess.CREATE_NEW_CONSOLE)
                 
                 return jsonify({
                     'status': 'success',
@@ -184,7 +405,7 @@ def start_game():
                     }
                 })
         except Exception as fallback_error:
-            print(f"Alternative launch method also failed: {fallback_error}")
+            app.logger.error(f"Alternative launch method also failed: {fallback_error}")
         
         return jsonify({
             'status': 'error',
@@ -198,53 +419,105 @@ def debug():
     debug_info = {
         'template_folder': app.template_folder,
         'static_folder': app.static_folder,
-        'templates_exist': os.path.exists(app.template_folder),
-        'static_exists': os.path.exists(app.static_folder),
-        'index_html_exists': os.path.exists(os.path.join(app.template_folder, 'index.html')),
-        'settings_html_exists': os.path.exists(os.path.join(app.template_folder, 'settings.html')),
-        'main_py_exists': os.path.exists(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'main.py'))),
+        'templates_exist': _TEMPLATE_FILES is not None,
+        'static_exists': _STATIC_FILES is not None,
+        'index_html_exists': 'index.html' in (_TEMPLATE_FILES or ()),
+        'settings_html_exists': 'settings.html' in (_TEMPLATE_FILES or ()),
+        'main_py_exists': MAIN_PY_EXISTS,
         'cwd': os.getcwd(),
         'python_path': sys.executable,
     }
     return jsonify(debug_info)
 
+def _has_valid_signature(payload, sig_header):
+    """
+    Checks the v1 HMAC-SHA256 signatures in a Stripe-Signature header against the raw payload.
+    This is cheap compared to parsing the event, so forged requests are rejected before any JSON work.
+    """
+    if not sig_header:
+        return False
+    timestamp = None
+    signatures = []
+    for item in sig_header.split(','):
+        key, _, value = item.strip().partition('=')
+        if key == 't':
+            timestamp = value
+        elif key == 'v1':
+            signatures.append(value)
+    if timestamp is None or not signatures:
+        return False
+
+    mac = hmac.new(STRIPE_WEBHOOK_SECRET.encode(), timestamp.encode() + b'.', hashlib.sha256)
+    mac.update(payload) # Hash the body in place rather than concatenating a copy of it
+    expected = mac.hexdigest()
+    return any(hmac.compare_digest(expected, signature) for signature in signatures)
+
 # --- Stripe webhook handling (for asynchronous payment events) ---
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """Handle Stripe webhook events for payment completion, refunds, etc."""
     event = None
-    payload = request.data
+    # Reject oversized (or unsized) bodies before reading them; get_data() doesn't enforce MAX_CONTENT_LENGTH
+    if request.content_length is None or request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        abort(413)
+    payload = request.get_data(cache=False) # Read the body once without Flask keeping a second copy
     sig_header = request.headers.get('Stripe-Signature')
 
+    if not _has_valid_signature(payload, sig_header):
+        app.logger.warning("Invalid signature")
+        return jsonify(success=False), 400
+
+    stripe = _get_stripe()
     try:
         event = stripe.Webhook.construct_event(
             payload, sig_header, STRIPE_WEBHOOK_SECRET
         )
     except ValueError as e:
         # Invalid payload
-        print(f"Invalid payload: {e}")
+        app.logger.warning(f"Invalid payload: {e}")
         return jsonify(success=False), 400
     except stripe.error.SignatureVerificationError as e:
         # Invalid signature
-        print(f"Invalid signature: {e}")
+        app.logger.warning(f"Invalid signature: {e}")
         return jsonify(success=False), 400
     
     # Handle the event
     if event.type == 'checkout.session.completed':
         session = event.data.object
-        print(f"Payment successful for session {session.id}")
+        app.logger.info(f"Payment successful for session {session.id}")
+        _record_payment_status(session.id, session.payment_status)
         # You can save customer info in your database here if needed
         # customer_email = session.customer_details.email
     
     return jsonify(success=True)
 
+# Redirect targets and pages are static, so resolve and render them once now that all routes exist
+with app.test_request_context():
+    SUCCESS_URL_PATH = url_for('success')
+    SETTINGS_URL_PATH = url_for('game_settings')
+    INDEX_PAGE = _render_static_page(INDEX_TMPL)
+    SETTINGS_PAGE = _render_static_page(SETTINGS_TMPL)
+
 # --- Run the App ---
 if __name__ == '__main__':
-    print(f"Template folder: {app.template_folder}")
-    print(f"Static folder: {app.static_folder}")
-    print(f"Working directory: {os.getcwd()}")
+    app.logger.info(f"Template folder: {app.template_folder}")
+    app.logger.info(f"Static folder: {app.static_folder}")
+    app.logger.info(f"Working directory: {os.getcwd()}")
     
     # Use 0.0.0.0 to make it accessible on your network if needed,
     # otherwise 127.0.0.1 (localhost) is fine.
-    # Debug=True is helpful during development but should be OFF in production.
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if '--dev' in sys.argv:
+        # Werkzeug's dev server with the debugger and reloader; development only
+        app.run(debug=True, host='0.0.0.0', port=5000)
+    else:
+        # Single server process, so start the warm launcher now rather than on the first game
+        with _launcher_lock:
+            _start_launcher()
+        # Multi-threaded production server so slow Stripe calls don't block other requests.
+        # On Linux/Mac you can also run: gunicorn -w 4 -k gthread --threads 8 wsgi:application
+        try:
+            from waitress import serve
+            serve(app, host='0.0.0.0', port=5000, threads=8)
+        except ImportError:
+            app.logger.warning("waitress is not installed; falling back to Flask's threaded server")
+            app.run(host='0.0.0.0', port=5000, threaded=True)
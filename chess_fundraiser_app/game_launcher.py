@@ -0,0 +1,75 @@
+"""
+Keeps a warm Python interpreter around for launching the pygame chess game.
+
+The Flask app starts this script once and writes "<skill> <color>" lines to
+its stdin. Each line is handled by forking this already-initialized process,
+so a new game skips interpreter start-up and the pygame/chess imports.
+After each request the launcher writes the forked game's PID (or "error")
+as a line to the reply pipe, so the app knows the game actually started.
+Only used on platforms with os.fork (Linux/Mac).
+
+Usage: python game_launcher.py /path/to/main.py <reply fd>
+"""
+import os
+import runpy
+import signal
+import sys
+import traceback
+
+# Import the heavy game dependencies once, up front, so forked games start warm
+import chess
+import chess.engine
+import pygame
+
+
+def launch_game(main_py_path, reply_fd, skill, color):
+    """Forks a child process that runs main.py with the given settings. Returns the child's PID."""
+    pid = os.fork()
+    if pid != 0:
+        return pid # Parent: go back to waiting for the next request
+
+    # Child: detach from the launcher and run the game as if started directly
+    exit_code = 0
+    try:
+        os.setsid()
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL) # The engine needs to wait on its own process
+        os.close(reply_fd)
+        sys.stdin.close()
+        sys.argv = [main_py_path, '--skill', skill, '--color', color]
+        runpy.run_path(main_py_path, run_name='__main__')
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 0
+    except BaseException:
+        print("Error running game:", file=sys.stderr)
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        # os._exit skips interpreter shutdown, so flush buffered output ourselves
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def main():
+    main_py_path = sys.argv[1]
+    reply_fd = int(sys.argv[2])
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN) # Let the OS reap finished games
+
+    for line in sys.stdin:
+        parts = line.split()
+        if len(parts) != 2:
+            print(f"Game launcher: ignoring malformed request {line!r}")
+            reply = "error"
+        else:
+            try:
+                reply = str(launch_game(main_py_path, reply_fd, *parts))
+            except OSError as e:
+                print(f"Game launcher: could not fork a game: {e}")
+                reply = "error"
+        os.write(reply_fd, f"{reply}\n".encode())
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,10 @@ STRIPE_SECRET_KEY = "sk_test_your_test_secret_key"  # Replace with your test sec
 STRIPE_PUBLISHABLE_KEY = "pk_test_your_test_publishable_key"  # Replace with your test publishable key
 STRIPE_WEBHOOK_SECRET = "whsec_your_webhook_secret"  # Replace with your webhook secret
 
+# Optional: ID of a Price created once in the Stripe Dashboard (e.g. "price_...")
+# When set, checkout sessions reference it instead of sending product data each time
+STRIPE_PRICE_ID = None
+
 # Your domain for Stripe to redirect back to
 YOUR_DOMAIN = "http://localhost:5000"
 
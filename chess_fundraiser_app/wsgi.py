@@ -0,0 +1,14 @@
+"""
+WSGI entry point for serving the fundraiser app with a production server.
+
+Linux/Mac:  gunicorn -w 4 -k gthread --threads 8 wsgi:application
+Windows:    waitress-serve --port=5000 --threads=8 wsgi:application
+
+Run either command from the chess_fundraiser_app directory.
+"""
+try:
+    from .app import app
+except ImportError:
+    from app import app
+
+application = app
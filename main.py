@@ -5,6 +5,8 @@ import chess.engine # Added for engine communication
 import os # Added for path joining
 import time # Import time for potential simple delays, though pygame.time is better for non-blocking
 import argparse # Import for command line argument parsing
+import threading # Shutting down replaced engines without blocking
+from concurrent.futures import ThreadPoolExecutor # Runs engine searches off the main thread
 
 # Parse command line arguments
 def parse_arguments():
@@ -44,6 +46,12 @@ SQUARE_SIZE = 60
 BOARD_WIDTH = BOARD_HEIGHT = BOARD_SIZE * SQUARE_SIZE
 BOARD_X = (SCREEN_WIDTH - BOARD_WIDTH) // 2
 BOARD_Y = (SCREEN_HEIGHT - BOARD_HEIGHT - 80) // 2 + 40
+# Game screen buttons (New Game / Resign), centered below the board
+GAME_BUTTON_WIDTH = 120
+GAME_BUTTON_HEIGHT = 40
+GAME_BUTTON_SPACING = 30
+GAME_BUTTON_Y = BOARD_Y + BOARD_HEIGHT + 20
+GAME_BUTTONS_X = (SCREEN_WIDTH - (GAME_BUTTON_WIDTH * 2 + GAME_BUTTON_SPACING)) // 2
 # Colors
 WHITE_COL = (255, 255, 255)
 BLACK_COL = (0, 0, 0)
@@ -64,6 +72,11 @@ PIECE_DIR = os.path.join(ASSETS_DIR, "pieces")
 # Game Settings (Defaults - will be set by menu)
 AI_THINK_TIME = 0.5
 AI_MOVE_DELAY = 500
+# Engine performance settings
+ENGINE_HASH_MB = 256 # Transposition table size
+ENGINE_THREADS_MIN_SKILL = 3 # Use multiple search threads from this skill level up (lower levels stay single-threaded)
+# Debugging
+DEBUG = False # Print per-click/per-move trace output (off by default to keep console I/O out of the game loop)
 
 # --- Pygame and Font Initialization ---
 pygame.init()
@@ -87,6 +100,21 @@ except Exception as e:
     MENU_TITLE_FONT = pygame.font.Font(None, 50)
     MENU_OPTION_FONT = pygame.font.Font(None, 36)
 
+# --- Text Rendering Cache ---
+TEXT_CACHE_SIZE = 64
+_TEXT_CACHE = {}
+
+def render_cached(font, text, color):
+    """Renders antialiased text, reusing the surface if this font/text/color was rendered before."""
+    key = (id(font), text, color)
+    text_surf = _TEXT_CACHE.get(key)
+    if text_surf is None:
+        text_surf = font.render(text, True, color)
+        if len(_TEXT_CACHE) >= TEXT_CACHE_SIZE:
+            del _TEXT_CACHE[next(iter(_TEXT_CACHE))] # Evict the oldest entry (dicts keep insertion order)
+        _TEXT_CACHE[key] = text_surf
+    return text_surf
+
 # --- Button Class ---
 class Button:
     def __init__(self, rect, text, font, text_color, bg_color, hover_color=None, selected_color=None, action=None, value=None):
@@ -102,6 +130,13 @@ class Button:
         self.is_hovered = False
         self.is_active = True
         self.is_selected = False # New state for menu buttons
+        # The rect never moves, so keep its bounds as plain ints for cheap hover checks
+        self._x0, self._y0, self._x1, self._y1 = self.rect.left, self.rect.top, self.rect.right, self.rect.bottom
+        self._topleft = self.rect.topleft
+        # The label never changes either, so render it once (plus a greyed-out copy for inactive buttons)
+        self._text_surf = font.render(text, True, text_color)
+        self._inactive_text_surf = font.render(text, True, (150, 150, 150))
+        self._text_pos = self._text_surf.get_rect(center=self.rect.center).topleft
 
     def draw(self, surface):
         current_bg = self.bg_color
@@ -115,25 +150,28 @@ class Button:
              # Example: draw slightly transparent
              temp_surf = pygame.Surface(self.rect.size, pygame.SRCALPHA)
              temp_surf.fill((*current_bg, 150)) # Use alpha for transparency
-             surface.blit(temp_surf, self.rect.topleft)
+             surface.blit(temp_surf, self._topleft)
              pygame.draw.rect(surface, (100,100,100), self.rect, 1, border_radius=5) # Grey border
         else:
              pygame.draw.rect(surface, current_bg, self.rect, border_radius=5)
 
 
-        text_surf = self.font.render(self.text, True, self.text_color if self.is_active else (150, 150, 150)) # Grey out text if inactive
-        text_rect = text_surf.get_rect(center=self.rect.center)
-        surface.blit(text_surf, text_rect)
+        text_surf = self._text_surf if self.is_active else self._inactive_text_surf # Grey out text if inactive
+        surface.blit(text_surf, self._text_pos)
 
     def check_hover(self, mouse_pos):
-        self.is_hovered = self.rect.collidepoint(mouse_pos)
-        return self.is_hovered
+        """Updates the hover state and returns True if it changed (the button needs redrawing)."""
+        x, y = mouse_pos
+        hovered = self._x0 <= x < self._x1 and self._y0 <= y < self._y1
+        changed = hovered != self.is_hovered
+        self.is_hovered = hovered
+        return changed
 
     def handle_click(self, mouse_pos):
         if self.is_active and self.rect.collidepoint(mouse_pos):
-            print(f"Button '{self.text}' clicked!") # Keep debug print
+            if DEBUG: print(f"Button '{self.text}' clicked!")
             if self.action:
-                print(f"---> Calling action: {self.action.__name__}")
+                if DEBUG: print(f"---> Calling action: {self.action.__name__}")
                 if self.value is not None:
                      self.action(self.value) # Pass value if action needs it
                 else:
@@ -148,26 +186,65 @@ player_color = chess.WHITE # Default
 engine = None
 board = chess.Board()
 selected_square = None
+selected_legal = {} # Destination square -> legal move for the piece on selected_square
 current_turn = chess.WHITE
-ai_move_trigger_time = None
 status_text = ""
 info_text = ""
+ui_text_blits = [] # (surface, rect) pairs for status_text/info_text, rebuilt by update_ui_text()
 game_over = False
 game_result_message = None
 game_state = MENU # Start in the menu state
+needs_redraw = True # Only redraw the game screen when something visible has changed
+full_redraw = True # Present the whole window on the next redraw, not just GAME_DIRTY_RECT
 
-# Create the screen
+# Create the screen. A plain software window is used on purpose: vsync needs pygame.SCALED,
+# whose renderer path turns display.update(rects) into a full flip and would undo the
+# partial updates in _handle_playing (and may upscale the window on large desktops).
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption(SCREEN_TITLE)
 
+# Only QUIT, clicks, mouse motion (for hover) and expose/focus events are handled,
+# so keep SDL from queuing the high-volume input events nobody reads
+IGNORED_EVENT_TYPES = [
+    pygame.MOUSEBUTTONUP, pygame.MOUSEWHEEL,
+    pygame.KEYDOWN, pygame.KEYUP, pygame.TEXTINPUT, pygame.TEXTEDITING,
+    pygame.FINGERDOWN, pygame.FINGERUP, pygame.FINGERMOTION,
+]
+pygame.event.set_blocked(IGNORED_EVENT_TYPES)
+# Events the game screen reacts to (the game-over idle check waits for one of these)
+GAME_EVENT_TYPES = [pygame.QUIT, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION, pygame.VIDEOEXPOSE, pygame.ACTIVEEVENT]
+AI_READY_EVENT = pygame.event.custom_type() # Fired by a one-shot timer when the AI should start its move
+
+# Semi-transparent overlays are built once here instead of on every frame
+HIGHLIGHT_SURFACE = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA) # SRCALPHA allows transparency
+HIGHLIGHT_SURFACE.fill(HIGHLIGHT_COLOR)
+HIGHLIGHT_SURFACE = HIGHLIGHT_SURFACE.convert_alpha()
+# Game over box, slightly smaller than the board and centered vertically on it
+GAME_OVER_OVERLAY_MARGIN = 10
+GAME_OVER_OVERLAY_RECT = pygame.Rect(
+    BOARD_X + GAME_OVER_OVERLAY_MARGIN,
+    BOARD_Y + BOARD_HEIGHT // 2 - 40,
+    BOARD_WIDTH - 2 * GAME_OVER_OVERLAY_MARGIN,
+    80 # Fixed height for the overlay box
+)
+GAME_OVER_OVERLAY_SURFACE = pygame.Surface(GAME_OVER_OVERLAY_RECT.size, pygame.SRCALPHA)
+GAME_OVER_OVERLAY_SURFACE.fill(GAME_OVER_BG_COLOR)
+GAME_OVER_OVERLAY_SURFACE = GAME_OVER_OVERLAY_SURFACE.convert_alpha()
+# Everything that changes on the game screen lies in the board's columns, from the
+# status text above the board down to the buttons below it
+GAME_DIRTY_RECT = pygame.Rect(BOARD_X, BOARD_Y - 70, BOARD_WIDTH, BOARD_HEIGHT + 130)
+
 # --- Asset Loading ---
 def load_piece_images(size):
     """Loads and scales piece images from the assets directory."""
     pieces = {}
     piece_symbols = ['wP', 'wN', 'wB', 'wR', 'wQ', 'wK', 'bP', 'bN', 'bB', 'bR', 'bQ', 'bK']
     
-    # Check if piece directory exists
-    if not os.path.exists(PIECE_DIR):
+    # List the piece directory once instead of checking each file separately
+    try:
+        available = set(os.listdir(PIECE_DIR))
+    except OSError:
+        available = set()
         print(f"ERROR: Piece directory not found: {PIECE_DIR}")
         print(f"Current working directory: {os.getcwd()}")
         print(f"Script directory: {SCRIPT_DIR}")
@@ -187,7 +264,7 @@ def load_piece_images(size):
             path = os.path.join(PIECE_DIR, f"{symbol}.png")
             
             # Check if the file exists before trying to load it
-            if not os.path.exists(path):
+            if f"{symbol}.png" not in available:
                 print(f"ERROR: Piece image not found: {path}")
                 pieces[symbol] = None
                 continue
@@ -195,6 +272,7 @@ def load_piece_images(size):
             # Load and scale the image
             image = pygame.image.load(path).convert_alpha() # Load with transparency
             image = pygame.transform.smoothscale(image, (size, size))
+            image = image.convert_alpha(screen) # Match the display format so blits don't convert per frame
             pieces[symbol] = image
             print(f"Successfully loaded image: {path}")
         except (pygame.error, FileNotFoundError) as e:
@@ -217,40 +295,92 @@ def load_piece_images(size):
 
 PIECE_IMAGES = load_piece_images(SQUARE_SIZE)
 
+def build_piece_image_lookup(images):
+    """Returns a flat list of piece images indexed by (piece_type << 1) | color."""
+    lookup = [None] * 16
+    for piece_type in chess.PIECE_TYPES:
+        for color in chess.COLORS:
+            symbol = ('w' if color == chess.WHITE else 'b') + chess.piece_symbol(piece_type).upper()
+            lookup[(piece_type << 1) | color] = images.get(symbol)
+    return lookup
+
+PIECE_IMG_BY_KEY = build_piece_image_lookup(PIECE_IMAGES)
+BOARD_BG_SURFACE = None # Pre-rendered board squares, rebuilt when the orientation changes
+# Board squares, selection highlight and pieces composited together; only rebuilt when one of them changes
+BOARD_COMPOSITE = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT)).convert()
+board_composite_key = None # State BOARD_COMPOSITE was last built from
+
+def build_square_board_xy(orientation):
+    """Returns the top-left corner of each square (0-63) relative to the board, for the given player color."""
+    square_xy = []
+    for square_index in range(64):
+        file = chess.square_file(square_index)
+        rank = chess.square_rank(square_index)
+        if orientation == chess.WHITE:
+            square_xy.append((file * SQUARE_SIZE, (BOARD_SIZE - 1 - rank) * SQUARE_SIZE))
+        else:
+            square_xy.append(((BOARD_SIZE - 1 - file) * SQUARE_SIZE, rank * SQUARE_SIZE))
+    return square_xy
+
+# Board-relative position lookup for each square, indexed by player color then square
+SQUARE_BOARD_XY = {
+    chess.WHITE: build_square_board_xy(chess.WHITE),
+    chess.BLACK: build_square_board_xy(chess.BLACK),
+}
+
+def build_screen_to_square(orientation):
+    """Returns the square index at each screen cell (screen_row * 8 + screen_col) for the given player color."""
+    screen_to_square = [None] * 64
+    for square_index, (board_x, board_y) in enumerate(build_square_board_xy(orientation)):
+        screen_col = board_x // SQUARE_SIZE
+        screen_row = board_y // SQUARE_SIZE
+        screen_to_square[screen_row * BOARD_SIZE + screen_col] = square_index
+    return screen_to_square
+
+# Inverse lookup used for mouse clicks, indexed by player color then screen cell
+SCREEN_TO_SQ = {
+    chess.WHITE: build_screen_to_square(chess.WHITE),
+    chess.BLACK: build_screen_to_square(chess.BLACK),
+}
+
 
 # --- Game Logic Functions ---
-def determine_game_outcome():
-    """Determines the game result string if the game has ended naturally."""
-    if board.is_game_over():
-        outcome = board.outcome()
-        if outcome:
-            winner_color = "White" if outcome.winner == chess.WHITE else "Black" if outcome.winner == chess.BLACK else None
-            termination = str(outcome.termination).split('.')[1].replace('_', ' ').title()
-            if winner_color:
-                # Use more standard phrasing
-                reason = "Checkmate" if termination == "Checkmate" else f"on time?" # Placeholder, outcome doesn't give resignation
-                return f"{termination}! {winner_color} Wins" 
-            else: # Draw
-                return f"{termination}! Draw"
-        else:
-             # Should not happen if is_game_over is true, but cover it
-             return "Game Over: Unknown Reason"
-    return None # Game not over
+def determine_game_outcome(outcome):
+    """Formats the game result string from a chess.Outcome (None if the game hasn't ended)."""
+    if outcome is None:
+        return None # Game not over
+    winner_color = "White" if outcome.winner == chess.WHITE else "Black" if outcome.winner == chess.BLACK else None
+    termination = str(outcome.termination).split('.')[1].replace('_', ' ').title()
+    if winner_color:
+        return f"{termination}! {winner_color} Wins" 
+    else: # Draw
+        return f"{termination}! Draw"
+
+def _safe_quit(old_engine):
+    """Quits an engine instance, ignoring errors (used for background shutdown)."""
+    try:
+        old_engine.quit()
+    except Exception as e:
+        print(f"Minor error quitting previous engine instance: {e}")
 
 def initialize_engine(skill_level):
     """Initializes or re-initializes the chess engine with a specific skill level."""
     global engine
-    if engine: # Shutdown existing engine first if any
-        try:
-            engine.quit()
-        except Exception as e:
-            print(f"Minor error quitting previous engine instance: {e}")
+    if engine: # Shut down the existing engine in the background so the new one starts right away
+        old_engine = engine
         engine = None
+        threading.Thread(target=_safe_quit, args=(old_engine,), daemon=True).start()
 
     try:
         print(f"Initializing engine with Skill Level {skill_level}...")
         engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
         engine.configure({"Skill Level": skill_level})
+        # Give the engine a bigger hash table, plus more threads at the levels where it searches deeply
+        threads = max(1, (os.cpu_count() or 1) - 1) if skill_level >= ENGINE_THREADS_MIN_SKILL else 1
+        try:
+            engine.configure({"Threads": threads, "Hash": ENGINE_HASH_MB})
+        except chess.engine.EngineError as e:
+            print(f"Could not set engine Threads/Hash, using defaults: {e}")
         print(f"Stockfish engine initialized successfully.")
         return True
     except (FileNotFoundError, OSError, chess.engine.EngineError) as e:
@@ -261,8 +391,8 @@ def initialize_engine(skill_level):
 
 def reset_game(start_engine_if_needed=True):
     """Resets the game state. Optionally initializes engine based on global settings."""
-    global board, selected_square, current_turn, ai_move_trigger_time, info_text, game_over, game_result_message, engine
-    print("DEBUG: reset_game() called")
+    global board, selected_square, selected_legal, current_turn, info_text, game_over, game_result_message, engine, ai_future, engine_game
+    if DEBUG: print("DEBUG: reset_game() called")
 
     # Initialize engine ONLY if start_engine_if_needed is True
     if start_engine_if_needed and not engine:
@@ -271,8 +401,11 @@ def reset_game(start_engine_if_needed=True):
     print("Resetting board state...")
     board = chess.Board()
     selected_square = None
+    selected_legal = {}
     current_turn = chess.WHITE
-    ai_move_trigger_time = None
+    pygame.time.set_timer(AI_READY_EVENT, 0) # Cancel any AI move still scheduled for the previous game
+    ai_future = None # Drop any search still running for the previous game
+    engine_game = object() # New game for the engine
     info_text = ""
     game_over = False
     game_result_message = None
@@ -280,12 +413,12 @@ def reset_game(start_engine_if_needed=True):
 
     # Trigger initial AI move AFTER resetting state if player is Black
     if player_color == chess.BLACK and not game_over and engine:
-         ai_move_trigger_time = pygame.time.get_ticks() + 100 # Small extra delay after reset
+         pygame.time.set_timer(AI_READY_EVENT, AI_MOVE_DELAY + 100, loops=1) # Small extra delay after reset
          print("New Game: Player is Black. AI (White) making first move...")
 
 def resign_game():
     """Handles player resignation."""
-    print("DEBUG: resign_game() called") # DEBUG PRINT
+    if DEBUG: print("DEBUG: resign_game() called") # DEBUG PRINT
     global game_over, info_text, game_result_message
     if not game_over:
         print("Player resigns.")
@@ -298,33 +431,26 @@ def resign_game():
 def get_square_from_mouse(pos):
     """Converts mouse coordinates to a chess square index, considering board orientation."""
     x, y = pos
+    board_x, board_y = BOARD_X, BOARD_Y # Local copies of globals used more than once
     # Check if the click is within the board boundaries
-    if not (BOARD_X <= x < BOARD_X + BOARD_WIDTH and BOARD_Y <= y < BOARD_Y + BOARD_HEIGHT):
+    if not (board_x <= x < board_x + BOARD_WIDTH and board_y <= y < board_y + BOARD_HEIGHT):
         return None # Click was outside the board
     
     # Calculate the row and column index based on screen coordinates (0-7 from top-left)
-    screen_col = (x - BOARD_X) // SQUARE_SIZE
-    screen_row = (y - BOARD_Y) // SQUARE_SIZE
+    screen_col = (x - board_x) // SQUARE_SIZE
+    screen_row = (y - board_y) // SQUARE_SIZE
     
-    # Convert screen coordinates to logical chess file (0-7, a-h) and rank (0-7, 1-8)
-    if player_color == chess.WHITE:
-        # For white, screen col directly maps to file
-        file = screen_col 
-        # Screen row 0 is rank 7, screen row 7 is rank 0
-        rank = BOARD_SIZE - 1 - screen_row 
-    else: # Player is Black, board is flipped visually
-        # Screen col 0 (left) is h-file (7), screen col 7 (right) is a-file (0)
-        file = BOARD_SIZE - 1 - screen_col
-        # Screen row 0 (top) is rank 0 (1st rank), screen row 7 (bottom) is rank 7 (8th rank)
-        rank = screen_row 
-        
-    # Convert logical file and rank to the single square index (0-63)
-    square_index = chess.square(file, rank)
-    return square_index
+    # Look up the square, which accounts for the board being flipped when playing Black
+    return SCREEN_TO_SQ[player_color][screen_row * BOARD_SIZE + screen_col]
+
+def legal_moves_from(square):
+    """Maps each legal destination of the piece on square to its move (pawns always promote to a queen)."""
+    return {move.to_square: move for move in board.generate_legal_moves(from_mask=chess.BB_SQUARES[square])
+            if move.promotion in (None, chess.QUEEN)}
 
 def update_ui_text():
     """Updates the status_text and info_text based on the game state."""
-    global status_text, info_text
+    global status_text, info_text, ui_text_blits
     
     # Always set the current turn text
     turn_color_name = "White" if board.turn == chess.WHITE else "Black"
@@ -337,13 +463,22 @@ def update_ui_text():
         # Clear info text if game is over or not in check
         info_text = ""
 
+    # Render the text here, once per change, so draw_ui_text() only has to blit it
+    status_surf = render_cached(STATUS_FONT, status_text, TEXT_COLOR)
+    ui_text_blits = [(status_surf, status_surf.get_rect(center=(SCREEN_WIDTH // 2, BOARD_Y - 45)))]
+    if info_text:
+        info_surf = render_cached(INFO_FONT, info_text, INFO_TEXT_COLOR)
+        ui_text_blits.append((info_surf, info_surf.get_rect(center=(SCREEN_WIDTH // 2, BOARD_Y - 15))))
+
 # --- Drawing Functions ---
-def draw_board(surface):
-    """Draws the chessboard squares, considering board orientation."""
+def build_board_background(orientation):
+    """Pre-renders the board squares for the given player color into BOARD_BG_SURFACE."""
+    global BOARD_BG_SURFACE
+    background = pygame.Surface((BOARD_WIDTH, BOARD_HEIGHT)).convert()
     for screen_row in range(BOARD_SIZE):
         for screen_col in range(BOARD_SIZE):
             # Determine logical rank/file for this screen position
-            if player_color == chess.WHITE:
+            if orientation == chess.WHITE:
                 logical_rank = BOARD_SIZE - 1 - screen_row
                 logical_file = screen_col
             else: # Player is Black
@@ -354,69 +489,45 @@ def draw_board(surface):
             is_light = (logical_rank + logical_file) % 2 == 0
             color = LIGHT_SQUARE if is_light else DARK_SQUARE
             
-            # Calculate screen position (top-left corner of square)
-            screen_x = BOARD_X + screen_col * SQUARE_SIZE
-            screen_y = BOARD_Y + screen_row * SQUARE_SIZE
-            
-            rect = pygame.Rect(screen_x, screen_y, SQUARE_SIZE, SQUARE_SIZE)
-            pygame.draw.rect(surface, color, rect)
+            # Position of the square within the background surface
+            rect = pygame.Rect(screen_col * SQUARE_SIZE, screen_row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+            pygame.draw.rect(background, color, rect)
+    BOARD_BG_SURFACE = background
+
+def rebuild_board_composite():
+    """Redraws the board squares, selection highlight and pieces into BOARD_COMPOSITE."""
+    BOARD_COMPOSITE.blit(BOARD_BG_SURFACE, (0, 0))
+    draw_selection(BOARD_COMPOSITE, selected_square)
+    draw_pieces(BOARD_COMPOSITE, board, PIECE_IMG_BY_KEY)
+
+def draw_board(surface):
+    """Draws the board with its pieces, re-compositing it only if the position, selection or orientation changed."""
+    global board_composite_key
+    key = (board, len(board.move_stack), selected_square, BOARD_BG_SURFACE)
+    if key != board_composite_key:
+        rebuild_board_composite()
+        board_composite_key = key
+    surface.blit(BOARD_COMPOSITE, (BOARD_X, BOARD_Y))
             
 def draw_pieces(surface, current_board, images):
-    """Draws the pieces on the board based on the chess.Board state."""
-    if not images: # Don't try drawing if images didn't load
-        return
-        
-    for square_index in range(64):
-        piece = current_board.piece_at(square_index)
-        if piece:
-            color = 'w' if piece.color == chess.WHITE else 'b'
-            piece_type = piece.symbol().upper()
-            symbol = f"{color}{piece_type}"
-            piece_image = images.get(symbol)
-
-            if piece_image: 
-                file = chess.square_file(square_index)
-                rank = chess.square_rank(square_index)
-                if player_color == chess.WHITE:
-                    screen_x = BOARD_X + file * SQUARE_SIZE
-                    screen_y = BOARD_Y + (BOARD_SIZE - 1 - rank) * SQUARE_SIZE
-                else:
-                    screen_x = BOARD_X + (BOARD_SIZE - 1 - file) * SQUARE_SIZE
-                    screen_y = BOARD_Y + rank * SQUARE_SIZE
-                img_rect = piece_image.get_rect(center=(screen_x + SQUARE_SIZE // 2, screen_y + SQUARE_SIZE // 2))
-                surface.blit(piece_image, img_rect.topleft)
-            else:
-                pass 
+    """Draws the pieces onto a board-sized surface based on the chess.Board state.
+    images is the lookup list from build_piece_image_lookup()."""
+    square_xy = SQUARE_BOARD_XY[player_color] # Read the global once; the loop below only touches locals
+    # piece_map() only returns occupied squares, so empty squares are skipped entirely.
+    # Images are scaled to SQUARE_SIZE, so they sit at the square's top-left.
+    blit_list = [(piece_image, square_xy[square_index])
+                 for square_index, piece in current_board.piece_map().items()
+                 if (piece_image := images[(piece.piece_type << 1) | piece.color])]
+    surface.blits(blit_list, doreturn=0) # One call for all pieces
 
 def draw_selection(surface, sq_index):
-    """Draws a highlight overlay on the selected square."""
+    """Draws a highlight overlay on the selected square onto a board-sized surface."""
     if sq_index is not None:
-        # Convert square index back to row/col for drawing
-        file = chess.square_file(sq_index)
-        rank = chess.square_rank(sq_index)
-        # Remember to flip rank for Pygame's coordinate system
-        if player_color == chess.WHITE:
-            screen_x = BOARD_X + file * SQUARE_SIZE
-            screen_y = BOARD_Y + (BOARD_SIZE - 1 - rank) * SQUARE_SIZE
-        else:
-            screen_x = BOARD_X + (BOARD_SIZE - 1 - file) * SQUARE_SIZE
-            screen_y = BOARD_Y + rank * SQUARE_SIZE
-        
-        # Create a semi-transparent surface for the highlight
-        highlight_surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA) # SRCALPHA allows transparency
-        highlight_surface.fill(HIGHLIGHT_COLOR)
-        surface.blit(highlight_surface, (screen_x, screen_y))
+        surface.blit(HIGHLIGHT_SURFACE, SQUARE_BOARD_XY[player_color][sq_index])
 
 def draw_ui_text(surface):
-    """Draws the turn status and info text."""
-    # Draw the main turn status
-    status_surf = STATUS_FONT.render(status_text, True, TEXT_COLOR)
-    status_rect = status_surf.get_rect(center=(SCREEN_WIDTH // 2, BOARD_Y - 45))
-    surface.blit(status_surf, status_rect)
-    if info_text:
-        info_surf = INFO_FONT.render(info_text, True, INFO_TEXT_COLOR)
-        info_rect = info_surf.get_rect(center=(SCREEN_WIDTH // 2, BOARD_Y - 15))
-        surface.blit(info_surf, info_rect)
+    """Draws the turn status and info text (pre-rendered by update_ui_text)."""
+    surface.blits(ui_text_blits, doreturn=0)
 
 def draw_buttons(surface, button_list): # Pass the list of buttons to draw
     """Draws all buttons in the provided list."""
@@ -426,62 +537,78 @@ def draw_buttons(surface, button_list): # Pass the list of buttons to draw
 def draw_game_over_overlay(surface):
     """Draws the centered game over message if the game has ended."""
     if game_over and game_result_message:
-        # Make the background overlay slightly smaller than the board
-        overlay_margin = 10
-        overlay_rect = pygame.Rect(
-            BOARD_X + overlay_margin,
-            BOARD_Y + BOARD_HEIGHT // 2 - 40, # Center vertically a bit better
-            BOARD_WIDTH - 2 * overlay_margin,
-            80 # Fixed height for the overlay box
-        )
-        overlay_surface = pygame.Surface(overlay_rect.size, pygame.SRCALPHA)
-        overlay_surface.fill(GAME_OVER_BG_COLOR)
-        surface.blit(overlay_surface, overlay_rect.topleft)
+        surface.blit(GAME_OVER_OVERLAY_SURFACE, GAME_OVER_OVERLAY_RECT.topleft)
 
         # Render and draw the centered text within the overlay rect
-        text_surf = GAME_OVER_FONT.render(game_result_message, True, GAME_OVER_TEXT_COLOR)
+        text_surf = render_cached(GAME_OVER_FONT, game_result_message, GAME_OVER_TEXT_COLOR)
         # Center the text within the overlay rectangle
-        text_rect = text_surf.get_rect(center=overlay_rect.center) 
+        text_rect = text_surf.get_rect(center=GAME_OVER_OVERLAY_RECT.center) 
         surface.blit(text_surf, text_rect)
 
-# --- AI Move Function ---
+# --- AI Move Functions ---
+AI_EXECUTOR = ThreadPoolExecutor(max_workers=1) # Single worker: the engine handles one search at a time
+ai_future = None # Pending background engine search, if any
+engine_game = None # Identifies the current game to the engine; a new one makes it clear its hash table
+
 def make_ai_move():
-    """Calculates and performs the AI's move. Now non-blocking for delay."""
-    global current_turn, board, game_over, ai_move_trigger_time, game_result_message
-    if engine and board.turn != player_color and not game_over:
-        print(f"AI ({'White' if board.turn == chess.WHITE else 'Black'}) is thinking...")
-        try:
-            # Use the constant for think time
-            result = engine.play(board, chess.engine.Limit(time=AI_THINK_TIME))
-            if result.move:
-                print(f"AI moves: {result.move.uci()}")
-                board.push(result.move)
-                current_turn = player_color # Switch back to player's turn
-                game_over = board.is_game_over() # Check game over state *after* move
-                if game_over:
-                    game_result_message = determine_game_outcome()
-                update_ui_text() # Update both status and info text
-            else:
-                # Engine might not find a move if it's already mate/stalemate
-                print("AI could not find a move.")
-                game_over = board.is_game_over()
-                if game_over:
-                    game_result_message = determine_game_outcome()
-                update_ui_text()
-                if not game_over: # Should ideally not happen unless engine error
-                   print("Warning: AI failed to move, but game is not over.")
-                   current_turn = player_color # Give control back?
-        except chess.engine.EngineError as e:
-            print(f"Engine error during AI move: {e}")
-            # Consider switching turn back or stopping the game on engine error
-            current_turn = player_color 
-            update_ui_text()
-        except Exception as e:
-            print(f"Unexpected error during AI move: {e}")
-            current_turn = player_color
+    """Starts the AI's move search in the background so the UI keeps running; finish_ai_move() applies it."""
+    global ai_future
+    if engine and board.turn != player_color and not game_over and ai_future is None:
+        if DEBUG: print(f"AI ({'White' if board.turn == chess.WHITE else 'Black'}) is thinking...")
+        # Search on a copy so the main thread never shares the board with the worker
+        # ponder=True keeps the engine searching on the player's time after it answers, and
+        # reusing engine_game keeps its hash table from earlier moves in this game
+        ai_future = AI_EXECUTOR.submit(engine.play, board.copy(), chess.engine.Limit(time=AI_THINK_TIME),
+                                       ponder=True, game=engine_game)
+
+def stop_engine_pondering():
+    """Ends the ponder search the engine keeps running after its moves (e.g. once the game is over)."""
+    if engine:
+        # Any new command cancels pondering; queue it behind a search that may still be running
+        AI_EXECUTOR.submit(engine.ping)
+
+def finish_ai_move():
+    """Applies the AI's move once its background search is done. Returns True if the game state changed."""
+    global current_turn, game_over, game_result_message, ai_future
+    if ai_future is None or not ai_future.done():
+        return False
+    future = ai_future
+    ai_future = None
+    if game_over: # Player resigned while the AI was thinking
+        return False
+
+    try:
+        result = future.result()
+        if result.move:
+            if DEBUG: print(f"AI moves: {result.move.uci()}")
+            board.push(result.move)
+            current_turn = player_color # Switch back to player's turn
+            outcome = board.outcome() # Check game over state *after* move (one scan, not two)
+            game_over = outcome is not None
+            if game_over:
+                game_result_message = determine_game_outcome(outcome)
+            update_ui_text() # Update both status and info text
+        else:
+            # Engine might not find a move if it's already mate/stalemate
+            print("AI could not find a move.")
+            outcome = board.outcome()
+            game_over = outcome is not None
+            if game_over:
+                game_result_message = determine_game_outcome(outcome)
             update_ui_text()
-        finally:
-             ai_move_trigger_time = None # Ensure timer is reset even if AI fails
+            if not game_over: # Should ideally not happen unless engine error
+               print("Warning: AI failed to move, but game is not over.")
+               current_turn = player_color # Give control back?
+    except chess.engine.EngineError as e:
+        print(f"Engine error during AI move: {e}")
+        # Consider switching turn back or stopping the game on engine error
+        current_turn = player_color 
+        update_ui_text()
+    except Exception as e:
+        print(f"Unexpected error during AI move: {e}")
+        current_turn = player_color
+        update_ui_text()
+    return True
 
 # --- Menu Function ---
 def run_menu():
@@ -497,7 +624,7 @@ def run_menu():
     def set_difficulty(level):
         nonlocal menu_selected_difficulty
         menu_selected_difficulty = level
-        print(f"Menu: Difficulty set to {level}")
+        if DEBUG: print(f"Menu: Difficulty set to {level}")
         # Update button selection state
         for btn in difficulty_buttons:
             btn.is_selected = (btn.value == level)
@@ -505,7 +632,7 @@ def run_menu():
     def set_color(color):
         nonlocal menu_selected_color
         menu_selected_color = color
-        print(f"Menu: Color set to {'White' if color == chess.WHITE else 'Black'}")
+        if DEBUG: print(f"Menu: Color set to {'White' if color == chess.WHITE else 'Black'}")
         # Update button selection state
         for btn in color_buttons:
             btn.is_selected = (btn.value == color)
@@ -516,6 +643,7 @@ def run_menu():
         if menu_selected_difficulty is not None and menu_selected_color is not None:
             chosen_skill_level = menu_selected_difficulty
             player_color = menu_selected_color
+            build_board_background(player_color)
             print("-" * 20)
             print(f"Starting Game: Skill={chosen_skill_level}, Player Color={'White' if player_color == chess.WHITE else 'Black'}")
             print("-" * 20)
@@ -585,18 +713,22 @@ def run_menu():
     start_btn.is_active = False # Start disabled
 
     all_menu_buttons = difficulty_buttons + color_buttons + [start_btn]
+    needs_redraw = True # Only redraw when a hover or selection has changed
+
+    # Hover states are updated from MOUSEMOTION events; start from where the mouse is now
+    mouse_pos = pygame.mouse.get_pos()
+    for button in all_menu_buttons:
+        button.check_hover(mouse_pos)
 
     # --- Menu Loop ---
     while menu_running:
-        mouse_pos = pygame.mouse.get_pos()
         menu_clock.tick(60)
 
-        # Check hover states
-        for button in all_menu_buttons:
-            button.check_hover(mouse_pos)
-
         # Enable Start button only if both options selected
-        start_btn.is_active = (menu_selected_difficulty is not None and menu_selected_color is not None)
+        can_start = (menu_selected_difficulty is not None and menu_selected_color is not None)
+        if start_btn.is_active != can_start:
+            start_btn.is_active = can_start
+            needs_redraw = True
 
         # Event Handling
         for event in pygame.event.get():
@@ -604,8 +736,15 @@ def run_menu():
                 menu_running = False
                 pygame.quit() # Quit pygame fully if closing from menu
                 sys.exit()
+            elif event.type == pygame.MOUSEMOTION:
+                for button in all_menu_buttons:
+                    if button.check_hover(event.pos):
+                        needs_redraw = True
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.ACTIVEEVENT):
+                needs_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
+                    needs_redraw = True
                     click_pos = event.pos
                     for button in all_menu_buttons:
                         # Make copies of button lists to avoid modifying during iteration if needed
@@ -614,18 +753,20 @@ def run_menu():
                             break # Assume only one button click per event
 
         # Drawing
+        if not needs_redraw:
+            continue
         screen.fill(WHITE_COL)
 
         # Draw Titles
-        title_surf = MENU_TITLE_FONT.render("Chess Game Setup", True, TEXT_COLOR)
+        title_surf = render_cached(MENU_TITLE_FONT, "Chess Game Setup", TEXT_COLOR)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH // 2, 50))
         screen.blit(title_surf, title_rect)
 
-        diff_label_surf = MENU_OPTION_FONT.render("Select AI Difficulty:", True, TEXT_COLOR) # Updated Label
+        diff_label_surf = render_cached(MENU_OPTION_FONT, "Select AI Difficulty:", TEXT_COLOR) # Updated Label
         diff_label_rect = diff_label_surf.get_rect(center=(SCREEN_WIDTH // 2, y_pos_diff - 40))
         screen.blit(diff_label_surf, diff_label_rect)
 
-        col_label_surf = MENU_OPTION_FONT.render("Select Your Color:", True, TEXT_COLOR)
+        col_label_surf = render_cached(MENU_OPTION_FONT, "Select Your Color:", TEXT_COLOR)
         col_label_rect = col_label_surf.get_rect(center=(SCREEN_WIDTH // 2, y_pos_col - 40))
         screen.blit(col_label_surf, col_label_rect)
 
@@ -633,12 +774,143 @@ def run_menu():
         draw_buttons(screen, all_menu_buttons)
 
         pygame.display.flip()
+        needs_redraw = False
+
+# --- Game Screen ---
+def _build_game_buttons():
+    """Creates the New Game and Resign buttons shown below the board."""
+    new_game_button = Button(
+        rect=(GAME_BUTTONS_X, GAME_BUTTON_Y, GAME_BUTTON_WIDTH, GAME_BUTTON_HEIGHT),
+        text="New Game", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
+        bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+        action=reset_game # Reset keeps current settings
+    )
+    resign_button = Button(
+        rect=(GAME_BUTTONS_X + GAME_BUTTON_WIDTH + GAME_BUTTON_SPACING, GAME_BUTTON_Y, GAME_BUTTON_WIDTH, GAME_BUTTON_HEIGHT),
+        text="Resign", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
+        bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
+        action=resign_game
+    )
+    game_buttons = [new_game_button, resign_button]
+    # Hover is event-driven from here on; start from the current mouse position
+    mouse_pos = pygame.mouse.get_pos()
+    for button in game_buttons:
+        button.check_hover(mouse_pos)
+    return game_buttons
+
+def _handle_playing(game_buttons):
+    """Runs one frame of the game screen: input, hover, AI timing and drawing. Returns False once the window is closed."""
+    global selected_square, selected_legal, current_turn, game_over, game_result_message
+    global needs_redraw, full_redraw
+    running = True
+    hover_changed = [] # Buttons whose hover state changed this frame
+    was_game_over = game_over
+    
+    # Event Handling
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.MOUSEMOTION:
+            # Update game button hover states only when the mouse actually moved
+            for button in game_buttons:
+                if button.check_hover(event.pos):
+                    hover_changed.append(button)
+        elif event.type == AI_READY_EVENT: # The AI_MOVE_DELAY pause after the player's move is over
+            make_ai_move()
+        elif event.type in (pygame.VIDEOEXPOSE, pygame.ACTIVEEVENT):
+            needs_redraw = full_redraw = True
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 1:
+                needs_redraw = True
+                click_pos = event.pos
+                button_clicked = False
+                # Check Game Buttons
+                for button in game_buttons:
+                    if button.handle_click(click_pos):
+                        button_clicked = True
+                        break
+    
+                # Check Board Interaction
+                if not button_clicked and current_turn == player_color and not game_over:
+                    clicked_square = get_square_from_mouse(click_pos)
+                    if clicked_square is not None:
+                        piece = board.piece_at(clicked_square)
+                        if selected_square is None:
+                            if piece is not None and piece.color == player_color:
+                                selected_square = clicked_square
+                                selected_legal = legal_moves_from(clicked_square)
+                            else: 
+                                selected_square = None
+                                selected_legal = {}
+                        else: # Attempt move
+                            move = selected_legal.get(clicked_square) # Legal moves were worked out on selection
+                            if move is not None:
+                                board.push(move)
+                                if DEBUG: print(f"Player ({'White' if player_color == chess.WHITE else 'Black'}) moves: {move.uci()}")
+                                selected_square = None
+                                selected_legal = {}
+                                current_turn = not player_color
+                                outcome = board.outcome()
+                                game_over = outcome is not None
+                                if game_over: 
+                                    game_result_message = determine_game_outcome(outcome)
+                                update_ui_text()
+                                if not game_over and engine:
+                                    pygame.time.set_timer(AI_READY_EVENT, AI_MOVE_DELAY, loops=1)
+                                    if DEBUG: print(f"AI turn starts. Delaying {AI_MOVE_DELAY}ms...")
+                            elif clicked_square == selected_square: 
+                                selected_square = None
+                                selected_legal = {}
+                            elif piece is not None and piece.color == player_color: 
+                                selected_square = clicked_square
+                                selected_legal = legal_moves_from(clicked_square)
+                            else: 
+                                if DEBUG: print(f"Illegal move attempt: {chess.Move(selected_square, clicked_square).uci()}")
+                    else: # Clicked outside board
+                        selected_square = None
+                        selected_legal = {}
+    
+    # Apply the AI's move once its background search finishes
+    if finish_ai_move():
+        needs_redraw = True
+    
+    # Resign is only clickable while a game is in progress; update it when that changes, not on every click
+    if game_over != was_game_over:
+        for button in game_buttons:
+            if button.action == resign_game:
+                button.is_active = not game_over
+        if game_over: # Mate, draw or resignation: don't let the engine keep pondering
+            stop_engine_pondering()
+        needs_redraw = True
+    
+    # Drawing
+    if needs_redraw:
+        screen.fill(WHITE_COL)
+        draw_board(screen) # Board, selection and pieces
+        draw_ui_text(screen)
+        draw_buttons(screen, game_buttons) # Draw game buttons
+        draw_game_over_overlay(screen)
+    
+        if full_redraw:
+            pygame.display.flip()
+            full_redraw = False
+        else:
+            pygame.display.update(GAME_DIRTY_RECT)
+        needs_redraw = False
+    elif hover_changed:
+        # Only hover highlights changed: repaint and present just those buttons
+        for button in hover_changed:
+            screen.fill(WHITE_COL, button.rect)
+            button.draw(screen)
+        pygame.display.update([button.rect for button in hover_changed])
+    return running
 
 # --- Main Function ---
 def main():
     """Main function to run the chess game."""
     global game_state, chosen_skill_level, player_color, engine, board, selected_square, current_turn
-    global ai_move_trigger_time, status_text, info_text, game_over, game_result_message
+    global status_text, info_text, game_over, game_result_message
+    global needs_redraw, full_redraw
     
     # Log startup information
     print("\n--- Chess Game Starting ---")
@@ -666,6 +938,7 @@ def main():
         # Get the values from the parsed arguments
         chosen_skill_level = args.skill
         player_color = chess.BLACK if args.color == 1 else chess.WHITE
+        build_board_background(player_color)
         game_state = PLAYING  # Skip the menu and go directly to playing
         
         print(f"Starting game with command line args: Skill={chosen_skill_level}, Color={'Black' if player_color == chess.BLACK else 'White'}")
@@ -675,242 +948,39 @@ def main():
         if not engine_initialized:
             print("WARNING: Failed to initialize chess engine. Game will continue without AI.")
         
-        # Create game screen buttons
-        button_y = BOARD_Y + BOARD_HEIGHT + 20
-        button_width = 120
-        button_height = 40
-        button_spacing = 30
-        total_button_width = (button_width * 2) + button_spacing
-        start_x = (SCREEN_WIDTH - total_button_width) // 2
-        new_game_button = Button(
-            rect=(start_x, button_y, button_width, button_height),
-            text="New Game", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
-            bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
-            action=reset_game # Reset keeps current settings
-        )
-        resign_button = Button(
-            rect=(start_x + button_width + button_spacing, button_y, button_width, button_height),
-            text="Resign", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
-            bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
-            action=resign_game
-        )
-        game_buttons = [new_game_button, resign_button]
+        game_buttons = _build_game_buttons()
         
         # Reset board state for the first game
         reset_game(start_engine_if_needed=False)  # Engine already started
-        
-        # Run the game loop
-        running = True
-        clock = pygame.time.Clock()
-        
-        while running:
-            dt = clock.tick(60)
-            
-            # Get mouse position for this frame
-            current_frame_mouse_pos = pygame.mouse.get_pos()
-            
-            # Update game button hover states
-            for button in game_buttons:
-                button.check_hover(current_frame_mouse_pos)
-            
-            # Event Handling
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if event.button == 1:
-                        click_pos = event.pos
-                        button_clicked = False
-                        # Check Game Buttons
-                        for button in game_buttons:
-                            if button.action == resign_game:
-                                button.is_active = not game_over
-                            else:
-                                button.is_active = True
-                            
-                            if button.handle_click(click_pos):
-                                button_clicked = True
-                                break
-                        
-                        # Check Board Interaction
-                        if not button_clicked and current_turn == player_color and not game_over:
-                            clicked_square = get_square_from_mouse(click_pos)
-                            if clicked_square is not None:
-                                piece = board.piece_at(clicked_square)
-                                if selected_square is None:
-                                    if piece is not None and piece.color == player_color:
-                                        selected_square = clicked_square
-                                    else: 
-                                        selected_square = None
-                                else: # Attempt move
-                                    move = chess.Move(selected_square, clicked_square)
-                                    moving_piece = board.piece_at(selected_square)
-                                    if moving_piece and moving_piece.piece_type == chess.PAWN:
-                                        target_rank = chess.square_rank(clicked_square)
-                                        is_promotion_rank = (player_color == chess.WHITE and target_rank == 7) or \
-                                                            (player_color == chess.BLACK and target_rank == 0)
-                                        if is_promotion_rank:
-                                            move.promotion = chess.QUEEN
-                                    if move in board.legal_moves:
-                                        board.push(move)
-                                        print(f"Player ({'White' if player_color == chess.WHITE else 'Black'}) moves: {move.uci()}")
-                                        selected_square = None
-                                        current_turn = not player_color
-                                        game_over = board.is_game_over()
-                                        if game_over: 
-                                            game_result_message = determine_game_outcome()
-                                        update_ui_text()
-                                        if not game_over and engine:
-                                            ai_move_trigger_time = pygame.time.get_ticks()
-                                            print(f"AI turn starts. Delaying {AI_MOVE_DELAY}ms...")
-                                    elif clicked_square == selected_square: 
-                                        selected_square = None
-                                    elif piece is not None and piece.color == player_color: 
-                                        selected_square = clicked_square
-                                    else: 
-                                        print(f"Illegal move attempt: {move.uci()}")
-                            else: # Clicked outside board
-                                selected_square = None
-                
-            # AI Move Timing
-            if not game_over and current_turn != player_color and engine and ai_move_trigger_time is not None:
-                current_time = pygame.time.get_ticks()
-                if current_time - ai_move_trigger_time >= AI_MOVE_DELAY:
-                    make_ai_move()
-            
-            # Drawing
-            screen.fill(WHITE_COL)
-            draw_board(screen)
-            if selected_square is not None: 
-                draw_selection(screen, selected_square)
-            draw_pieces(screen, board, PIECE_IMAGES)
-            draw_ui_text(screen)
-            draw_buttons(screen, game_buttons) # Draw game buttons
-            draw_game_over_overlay(screen)
-            
-            pygame.display.flip()
     
     else:
-        # The original game loop with menu
-        running = True
-        clock = pygame.time.Clock()
-        game_buttons = []  # Will be initialized after menu
+        # Show the setup menu first; it runs its own loop and sets game_state to PLAYING
+        run_menu()
         
-        while running:
-            dt = clock.tick(60)
-            
-            if game_state == MENU:
-                run_menu()  # This function handles its own loop and changes game_state
-                
-                # --- Post-Menu Initialization (only runs once after menu exits) ---
-                if game_state == PLAYING:
-                    # Initialize engine with chosen level
-                    initialize_engine(chosen_skill_level)
-                    
-                    # Create game screen buttons (only needs to happen once)
-                    button_y = BOARD_Y + BOARD_HEIGHT + 20
-                    button_width = 120
-                    button_height = 40
-                    button_spacing = 30
-                    total_button_width = (button_width * 2) + button_spacing
-                    start_x = (SCREEN_WIDTH - total_button_width) // 2
-                    new_game_button = Button(
-                        rect=(start_x, button_y, button_width, button_height),
-                        text="New Game", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
-                        bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
-                        action=reset_game # Reset keeps current settings
-                    )
-                    resign_button = Button(
-                        rect=(start_x + button_width + button_spacing, button_y, button_width, button_height),
-                        text="Resign", font=BUTTON_FONT, text_color=BUTTON_TEXT_COLOR,
-                        bg_color=BUTTON_BG_COLOR, hover_color=BUTTON_HOVER_COLOR,
-                        action=resign_game
-                    )
-                    game_buttons = [new_game_button, resign_button]
-                    
-                    # Reset board state for the very first game
-                    reset_game(start_engine_if_needed=False) # Engine already started
-            
-            elif game_state == PLAYING:
-                # --- Game Loop Logic ---
-                current_frame_mouse_pos = pygame.mouse.get_pos()
-                
-                # Update game button hover states
-                for button in game_buttons:
-                    button.check_hover(current_frame_mouse_pos)
-                
-                # Event Handling
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        running = False
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        if event.button == 1:
-                            click_pos = event.pos
-                            button_clicked = False
-                            # Check Game Buttons
-                            for button in game_buttons:
-                                if button.action == resign_game:
-                                    button.is_active = not game_over
-                                else:
-                                    button.is_active = True
-                                
-                                if button.handle_click(click_pos):
-                                    button_clicked = True
-                                    break
-                            
-                            # Check Board Interaction
-                            if not button_clicked and current_turn == player_color and not game_over:
-                                clicked_square = get_square_from_mouse(click_pos)
-                                if clicked_square is not None:
-                                    piece = board.piece_at(clicked_square)
-                                    if selected_square is None:
-                                        if piece is not None and piece.color == player_color:
-                                            selected_square = clicked_square
-                                        else: selected_square = None
-                                    else: # Attempt move
-                                        move = chess.Move(selected_square, clicked_square)
-                                        moving_piece = board.piece_at(selected_square)
-                                        if moving_piece and moving_piece.piece_type == chess.PAWN:
-                                            target_rank = chess.square_rank(clicked_square)
-                                            is_promotion_rank = (player_color == chess.WHITE and target_rank == 7) or \
-                                                                (player_color == chess.BLACK and target_rank == 0)
-                                            if is_promotion_rank:
-                                                move.promotion = chess.QUEEN
-                                        if move in board.legal_moves:
-                                            board.push(move)
-                                            print(f"Player ({'White' if player_color == chess.WHITE else 'Black'}) moves: {move.uci()}")
-                                            selected_square = None
-                                            current_turn = not player_color
-                                            game_over = board.is_game_over()
-                                            if game_over: game_result_message = determine_game_outcome()
-                                            update_ui_text()
-                                            if not game_over and engine:
-                                                ai_move_trigger_time = pygame.time.get_ticks()
-                                                print(f"AI turn starts. Delaying {AI_MOVE_DELAY}ms...")
-                                        elif clicked_square == selected_square: selected_square = None
-                                        elif piece is not None and piece.color == player_color: selected_square = clicked_square
-                                        else: print(f"Illegal move attempt: {move.uci()}")
-                                else: # Clicked outside board
-                                    selected_square = None
-                
-                # AI Move Timing
-                if not game_over and current_turn != player_color and engine and ai_move_trigger_time is not None:
-                    current_time = pygame.time.get_ticks()
-                    if current_time - ai_move_trigger_time >= AI_MOVE_DELAY:
-                        make_ai_move()
-                
-                # Drawing
-                screen.fill(WHITE_COL)
-                draw_board(screen)
-                if selected_square is not None: draw_selection(screen, selected_square)
-                draw_pieces(screen, board, PIECE_IMAGES)
-                draw_ui_text(screen)
-                draw_buttons(screen, game_buttons) # Draw game buttons
-                draw_game_over_overlay(screen)
-                
-                pygame.display.flip()
+        # Initialize engine with chosen level
+        initialize_engine(chosen_skill_level)
+        
+        game_buttons = _build_game_buttons()
+        
+        # Reset board state for the very first game
+        reset_game(start_engine_if_needed=False) # Engine already started
+    
+    # Run the game loop
+    running = True
+    clock = pygame.time.Clock()
+    needs_redraw = full_redraw = True
+    
+    tick, handle_playing = clock.tick, _handle_playing # Local bindings for the per-frame calls
+    while running:
+        dt = tick(60)
+        if game_over and not pygame.event.peek(GAME_EVENT_TYPES):
+            # Nothing changes on the game over screen without input, so check for it less often
+            pygame.time.wait(50)
+            continue
+        running = handle_playing(game_buttons)
     
     # --- Quit ---
+    AI_EXECUTOR.shutdown(wait=False, cancel_futures=True)
     if engine:
         print("Shutting down chess engine...")
         engine.quit()